@@ -0,0 +1,100 @@
+import time
+import asyncio
+
+
+# Время жизни записи кэша в секундах
+TTL = 300
+# Верхняя граница числа записей: ключи вида cart_totals:{user_id}
+# растут с числом пользователей, и без лимита кэш рос бы бесконечно
+MAXSIZE = 1024
+
+_cache = {}
+_inflight = {}
+
+
+def _evict():
+    """Удаляет просроченные записи и при переполнении - самые старые.
+
+    Вызывается перед вставкой новой записи, чтобы размер кэша не превышал
+    MAXSIZE. Порядок вставки словаря используется как порядок вытеснения.
+
+    Returns:
+        None: Функция ничего не возвращает.
+
+    """
+    now = time.monotonic()
+    for key in [k for k, (expires, _) in _cache.items() if expires <= now]:
+        _cache.pop(key, None)
+    while len(_cache) >= MAXSIZE:
+        _cache.pop(next(iter(_cache)))
+
+
+async def cached(key: str, loader, ttl: int = TTL):
+    """Возвращает значение из кэша или загружает его и сохраняет в кэш.
+
+    Функция используется для небольших справочных таблиц (категории, баннеры),
+    которые меняются только при действиях администратора, но читаются при каждой
+    навигации пользователя. Одновременные промахи по одному ключу объединяются:
+    запрос к базе выполняет только первый вызов, остальные ждут его результат
+    через общий Future вместо повторения того же запроса.
+
+    Args:
+        key (str): Ключ записи в кэше.
+        loader (Callable[[], Awaitable]): Корутина без аргументов, загружающая значение.
+        ttl (int): Время жизни записи в секундах. По умолчанию TTL.
+
+    Returns:
+        Any: Закэшированное или загруженное значение.
+
+    """
+    entry = _cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+
+    future = _inflight.get(key)
+    if future is not None:
+        # Отмена одного из ждущих вызовов не должна отменять общую загрузку
+        return await asyncio.shield(future)
+
+    future = asyncio.ensure_future(loader())
+    _inflight[key] = future
+    future.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    value = await future
+    _evict()
+    _cache[key] = (time.monotonic() + ttl, value)
+    return value
+
+
+def invalidate(prefix: str = ""):
+    """Удаляет из кэша записи, ключ которых начинается с префикса.
+
+    Вызывается из функций, изменяющих справочные данные, чтобы следующая
+    навигация пользователя увидела актуальные строки.
+
+    Args:
+        prefix (str): Префикс ключей для удаления. Пустой префикс очищает весь кэш.
+
+    Returns:
+        None: Функция ничего не возвращает.
+
+    """
+    for key in [k for k in _cache if k.startswith(prefix)]:
+        _cache.pop(key, None)
+
+
+def invalidate_key(key: str):
+    """Удаляет из кэша запись с точно совпадающим ключом.
+
+    Используется для ключей с числовым суффиксом вроде cart_totals:{user_id}:
+    удаление по префиксу там опасно, потому что корзина пользователя 12
+    сбрасывала бы и корзину пользователя 123.
+
+    Args:
+        key (str): Ключ записи для удаления.
+
+    Returns:
+        None: Функция ничего не возвращает.
+
+    """
+    _cache.pop(key, None)
@@ -1,5 +1,7 @@
 import os
 from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from database.models import Base
@@ -8,9 +10,26 @@ from database.requests import orm_create_categories, orm_add_banner_description
 
 load_dotenv()
 # Создание асинхронного SQLAlchemy движка для работы с базой данных
-engine = create_async_engine(url=os.getenv("SQLALCHEMY_URL"), echo=True)
+# Логирование SQL включается переменной окружения SQL_ECHO=1 (по умолчанию выключено)
+# Размеры пула соединений задаются переменными окружения, чтобы их можно
+# было поднять при развертывании без правки кода
+engine = create_async_engine(
+    url=os.getenv("SQLALCHEMY_URL", "sqlite+aiosqlite:///db.sqlite3"),
+    echo=bool(int(os.getenv("SQL_ECHO", "0"))),
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    query_cache_size=1200,
+)
 # Создание асинхронного sessionmaker для создания сессий
-async_session = async_sessionmaker(engine)
+# expire_on_commit=False: объекты остаются пригодными после коммита
+# без повторной загрузки из базы
+# autoflush=False: orm_*-функции делают flush явно после записей, поэтому
+# SELECT-ам не нужна проверка ожидающих изменений перед каждым запросом
+async_session = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
 
 
 async def async_main():
@@ -27,7 +46,21 @@ async def async_main():
     """
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # create_all не изменяет уже существующие таблицы, поэтому на базах,
+        # созданных до появления ограничения уникальности корзины, индекс
+        # создается явно: без него UPSERT по (user_id, product_id) падает
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_cart_user_product ON cart (user_id, product_id)"))
+        # По той же причине явно создаются индексы горячих выборок,
+        # объявленные в __table_args__ моделей
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_cart_user ON cart (user_id)"))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_product_category ON product (category_id)"))
 
     async with async_session() as session:
         await orm_create_categories(session, categories)
         await orm_add_banner_description(session, description_for_info_pages)
+        # orm_*-функции делают только flush; вне обработчиков обновлений
+        # (где коммитит middleware) транзакция фиксируется явно
+        await session.commit()
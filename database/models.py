@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, String, ForeignKey, Float, Text
+from sqlalchemy import BigInteger, String, ForeignKey, Float, Text, UniqueConstraint, Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.ext.asyncio import AsyncAttrs
 
@@ -27,7 +27,9 @@ class Banner(Base):
         id (int): Уникальный идентификатор баннера. Это первичный ключ, который
                       автоматически увеличивается при добавлении новой записи.
         name (str): Имя баннера, уникальное.
-        image (str): Ссылка на изображение баннера (опционально).
+        image (str): Telegram file_id изображения баннера (опционально).
+            Отправка по file_id обслуживается кэшем Telegram, байты
+            изображения через бота не проходят.
         description (str): Описание баннера (опционально).
 
     """
@@ -70,7 +72,7 @@ class Product(Base):
         name (str): Название продукта. Это обязательное поле, не может быть NULL.
         description (str): Описание продукта. Это поле  не может быть NULL.
         price (float): Цена продукта. Это обязательное поле, не может быть NULL.
-        image (str): Ссылка на изображение продукта. Не может быть NULL.
+        image (str): Telegram file_id изображения продукта. Не может быть NULL.
         category_id (int): Идентификатор категории, к которой относится продукт.
                             Связан внешним ключом с атрибутом id класса category.
                             Это обязательное поле, не может быть NULL.
@@ -78,15 +80,18 @@ class Product(Base):
 
     """
     __tablename__ = 'product'
+    __table_args__ = (Index('ix_product_category', 'category_id'),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(50))
     description: Mapped[str] = mapped_column(String(150))
-    price: Mapped[float] = mapped_column(Float(asdecimal=True))
+    price: Mapped[float] = mapped_column(Float)
     image: Mapped[str] = mapped_column(String(150))
     category_id: Mapped[int] = mapped_column(ForeignKey('category.id', ondelete='CASCADE'))
     quantity: Mapped[int]
 
+    carts: Mapped[list['Cart']] = relationship(back_populates='product')
+
 
 class User(Base):
     """Модель для таблицы 'cart'.
@@ -127,10 +132,14 @@ class Cart(Base):
 
     """
     __tablename__ = 'cart'
+    __table_args__ = (UniqueConstraint('user_id', 'product_id'),
+                      Index('ix_cart_user', 'user_id'))
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('user.user_id', ondelete='CASCADE'))
     product_id: Mapped[int] = mapped_column(ForeignKey('product.id', ondelete='CASCADE'))
     quantity: Mapped[int]
 
-    product: Mapped['Product'] = relationship(backref='cart')
+    # lazy="raise" превращает случайную ленивую загрузку (N+1 запрос) в явную ошибку:
+    # продукт нужно загружать вместе с корзиной через joinedload/selectinload
+    product: Mapped['Product'] = relationship(back_populates='carts', lazy='raise')
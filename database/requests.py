@@ -1,8 +1,64 @@
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, and_
+from sqlalchemy import select, insert, update, delete, and_, exists, bindparam, func
+from sqlalchemy.dialects.sqlite import insert as upsert
 
 from database.models import Banner, Cart, Category, Product, User
+from database.cache import cached, invalidate, invalidate_key
+
+# Счетчики для пагинации живут недолго: они меняются чаще справочников,
+# но почти каждый клик по страницам обходится без COUNT-запроса
+COUNT_TTL = 15
+
+
+# Часто выполняемые запросы собраны один раз на уровне модуля:
+# это убирает построение выражения на каждый вызов и гарантирует
+# попадание в кэш скомпилированного SQL
+_select_banner = select(Banner).where(Banner.name == bindparam("name"))
+# bindparam не может совпадать с именем колонки в SET-части update, отсюда префикс b_
+_update_banner_image = (
+    update(Banner)
+    .where(Banner.name == bindparam("b_name"))
+    .values(image=bindparam("b_image"))
+    .returning(Banner.id)
+    .execution_options(synchronize_session=False)
+)
+_select_categories = select(Category.id, Category.name)
+_select_products = (
+    select(Product.id, Product.name, Product.description, Product.price, Product.quantity, Product.image)
+    .where(Product.category_id == bindparam("category_id"))
+)
+# Постраничные запросы: пользовательское меню показывает один товар или одну
+# запись корзины за раз, поэтому страница выбирается в SQL через LIMIT/OFFSET
+# вместо загрузки всего списка ради одного элемента
+_select_product_page = (
+    select(Product.id, Product.name, Product.description, Product.price, Product.quantity, Product.image)
+    .where(Product.category_id == bindparam("category_id"))
+    .order_by(Product.id)
+    .limit(1)
+    .offset(bindparam("page_offset"))
+)
+_count_products = (
+    select(func.count())
+    .select_from(Product)
+    .where(Product.category_id == bindparam("category_id"))
+)
+_select_cart_page = (
+    select(Cart)
+    .where(Cart.user_id == bindparam("user_id"))
+    .options(joinedload(Cart.product))
+    .order_by(Cart.id)
+    .limit(1)
+    .offset(bindparam("page_offset"))
+)
+# Количество записей и общая стоимость корзины считаются одним запросом:
+# агрегаты выполняет база, в Python возвращаются два скаляра
+_cart_totals = (
+    select(func.count(), func.coalesce(func.sum(Cart.quantity * Product.price), 0))
+    .select_from(Cart)
+    .join(Product, Cart.product_id == Product.id)
+    .where(Cart.user_id == bindparam("user_id"))
+)
 
 
 # Категории
@@ -13,12 +69,14 @@ async def orm_get_categories(session: AsyncSession):
         session (AsyncSession): Асинхронная сессия SQLAlchemy.
 
     Returns:
-    List[Category]: Список объектов категории.
+    list[Row]: Список строк (id, name) категорий.
 
     """
-    query = select(Category)
-    result = await session.execute(query)
-    return result.scalars().all()
+    async def load():
+        result = await session.execute(_select_categories)
+        return result.all()
+
+    return await cached("categories", load)
 
 
 async def orm_create_categories(session: AsyncSession, categories: list):
@@ -35,12 +93,11 @@ async def orm_create_categories(session: AsyncSession, categories: list):
         None: Функция ничего не возвращает.
 
     """
-    query = select(Category)
-    result = await session.execute(query)
-    if result.first():
+    if await session.scalar(select(exists().select_from(Category))):
         return
-    session.add_all([Category(name=name) for name in categories])
-    await session.commit()
+    await session.execute(insert(Category), [{"name": name} for name in categories])
+    await session.flush()
+    invalidate("categories")
 
 
 # Баннер
@@ -58,12 +115,13 @@ async def orm_add_banner_description(session: AsyncSession, data: dict):
         None: Функция ничего не возвращает.
 
     """
-    query = select(Banner)
-    result = await session.execute(query)
-    if result.first():
+    if await session.scalar(select(exists().select_from(Banner))):
         return
-    session.add_all([Banner(name=name, description=description) for name, description in data.items()])
-    await session.commit()
+    await session.execute(
+        insert(Banner), [{"name": name, "description": description} for name, description in data.items()])
+    await session.flush()
+    invalidate("banner")
+    invalidate("info_pages")
 
 
 async def orm_change_banner_image(session: AsyncSession, name: str, image: str):
@@ -77,12 +135,14 @@ async def orm_change_banner_image(session: AsyncSession, name: str, image: str):
         image (str): Идентификатор изображения.
 
     Returns:
-        None: Функция ничего не возвращает.
+        bool: True, если баннер с таким именем существует и был обновлен, иначе - False.
 
     """
-    query = update(Banner).where(Banner.name == name).values(image=image)
-    await session.execute(query)
-    await session.commit()
+    result = await session.execute(_update_banner_image, {"b_name": name, "b_image": image})
+    await session.flush()
+    invalidate("banner")
+    invalidate("info_pages")
+    return result.first() is not None
 
 
 async def orm_get_banner(session: AsyncSession, name: str):
@@ -98,9 +158,14 @@ async def orm_get_banner(session: AsyncSession, name: str):
         Banner: Объект баннера, соответствующий странице.
 
     """
-    query = select(Banner).where(Banner.name == name)
-    result = await session.execute(query)
-    return result.scalar()
+    async def load():
+        result = await session.execute(_select_banner, {"name": name})
+        banner = result.scalar()
+        if banner is not None:
+            session.expunge(banner)
+        return banner
+
+    return await cached(f"banner:{name}", load)
 
 
 async def orm_get_info_pages(session: AsyncSession):
@@ -110,12 +175,54 @@ async def orm_get_info_pages(session: AsyncSession):
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
 
     Returns:
-        list[Banner]: Список всех объектов баннеров.
+        list[Row]: Список строк (id, name) баннеров.
 
     """
-    query = select(Banner)
-    result = await session.execute(query)
-    return result.scalars().all()
+    async def load():
+        result = await session.execute(select(Banner.id, Banner.name))
+        return result.all()
+
+    return await cached("info_pages", load)
+
+
+async def orm_get_info_page_names(session: AsyncSession):
+    """Возвращает названия страниц с баннерами в готовом для проверки и вывода виде.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+
+    Returns:
+        tuple[frozenset[str], str]: Множество названий страниц для быстрой проверки
+            вхождения и строка с названиями через запятую для сообщений пользователю.
+
+    """
+    async def load():
+        pages = await orm_get_info_pages(session)
+        names = frozenset(page.name for page in pages)
+        return names, ", ".join(sorted(names))
+
+    return await cached("info_pages_names", load)
+
+
+async def orm_warm_cache(session: AsyncSession):
+    """Прогревает кэш справочных данных при старте бота.
+
+    Категории и баннеры загружаются заранее, чтобы первые пользователи не
+    ждали запросов к базе; дальше записи обновляются по TTL и сбрасываются
+    при изменениях администратором.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+
+    Returns:
+        None: Функция ничего не возвращает.
+
+    """
+    await orm_get_categories(session)
+    pages = await orm_get_info_pages(session)
+    await orm_get_info_page_names(session)
+    for page in pages:
+        await orm_get_banner(session, page.name)
 
 
 # Взаимодействие с продуктами
@@ -150,7 +257,29 @@ async def orm_add_product(session: AsyncSession, data: dict):
         category_id=int(data["category"]),
     )
     session.add(obj)
-    await session.commit()
+    await session.flush()
+    invalidate("count:products")
+
+
+async def orm_bulk_add_products(session: AsyncSession, rows: list[dict]):
+    """Добавляет несколько продуктов одним запросом.
+
+    Используется при массовом добавлении товаров администратором: вместо
+    отдельной вставки и транзакции на каждый товар выполняется один
+    executemany INSERT.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy для взаимодействия с базой данных.
+        rows (list[dict]): Список словарей со значениями колонок таблицы `Product`
+            (name, description, price, quantity, image, category_id).
+
+    Returns:
+        None: Функция ничего не возвращает.
+
+    """
+    await session.execute(insert(Product), rows)
+    await session.flush()
+    invalidate("count:products")
 
 
 async def orm_get_products(session: AsyncSession, category_id):
@@ -164,12 +293,51 @@ async def orm_get_products(session: AsyncSession, category_id):
         category_id (int): ID категории, по которой будут отфильтрованы продукты.
 
     Returns:
-        list[Product]: Список объектов `Product`, соответствующих заданной категории.
+        list[Row]: Список строк (id, name, description, price, quantity, image)
+            продуктов заданной категории.
 
     """
-    query = select(Product).where(Product.category_id == category_id)
-    result = await session.execute(query)
-    return result.scalars().all()
+    result = await session.execute(_select_products, {"category_id": category_id})
+    return result.all()
+
+
+async def orm_get_product_page(session: AsyncSession, category_id: int, page: int):
+    """Получает один товар категории для заданной страницы.
+
+    Страница выбирается в SQL (LIMIT 1 OFFSET page-1), поэтому из базы
+    приходит одна строка независимо от размера категории.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy для работы с базой данных.
+        category_id (int): ID категории, по которой будут отфильтрованы продукты.
+        page (int): Номер страницы, начиная с 1.
+
+    Returns:
+        Row | None: Строка товара текущей страницы или None, если страница пуста.
+
+    """
+    result = await session.execute(_select_product_page, {"category_id": category_id, "page_offset": page - 1})
+    return result.first()
+
+
+async def orm_count_products(session: AsyncSession, category_id: int):
+    """Возвращает количество товаров в категории.
+
+    Значение кэшируется на COUNT_TTL секунд и сбрасывается при изменении
+    товаров администратором.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy для работы с базой данных.
+        category_id (int): ID категории, по которой будут отфильтрованы продукты.
+
+    Returns:
+        int: Количество товаров в категории.
+
+    """
+    async def load():
+        return await session.scalar(_count_products, {"category_id": category_id})
+
+    return await cached(f"count:products:{category_id}", load, ttl=COUNT_TTL)
 
 
 async def orm_get_product(session: AsyncSession, product_id: int):
@@ -186,9 +354,7 @@ async def orm_get_product(session: AsyncSession, product_id: int):
         Product | None: Объект `Product`, если продукт найден, или `None`, если продукт с таким ID не существует.
 
     """
-    query = select(Product).where(Product.id == product_id)
-    result = await session.execute(query)
-    return result.scalar()
+    return await session.get(Product, product_id)
 
 
 async def orm_update_product(session: AsyncSession, product_id: int, data):
@@ -222,7 +388,9 @@ async def orm_update_product(session: AsyncSession, product_id: int, data):
         )
 
     await session.execute(query)
-    await session.commit()
+    await session.flush()
+    # Товар мог сменить категорию, поэтому сбрасываются счетчики всех категорий
+    invalidate("count:products")
 
 
 async def orm_delete_product(session: AsyncSession, product_id: int):
@@ -240,7 +408,8 @@ async def orm_delete_product(session: AsyncSession, product_id: int):
     """
     query = delete(Product).where(Product.id == product_id)
     await session.execute(query)
-    await session.commit()
+    await session.flush()
+    invalidate("count:products")
 
 
 # Добавление юзера в БД
@@ -251,6 +420,9 @@ async def orm_add_user(
         last_name: str | None = None):
     """Добавляет нового пользователя в базу данных, если его еще не существует.
 
+    Вставка идемпотентна: вместо предварительного SELECT выполняется один
+    INSERT ... ON CONFLICT DO NOTHING, конфликт по user_id молча пропускается.
+
     Args:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
         user_id (int): Уникальный идентификатор пользователя.
@@ -261,20 +433,24 @@ async def orm_add_user(
         None: Функция ничего не возвращает.
 
     """
-    query = select(User).where(User.user_id == user_id)
-    result = await session.execute(query)
-    if result.first() is None:
-        session.add(User(user_id=user_id, first_name=first_name, last_name=last_name))
-        await session.commit()
+    query = (
+        upsert(User)
+        .values(user_id=user_id, first_name=first_name, last_name=last_name)
+        .on_conflict_do_nothing(index_elements=['user_id'])
+    )
+    await session.execute(query)
+    await session.flush()
 
 
 # Корзина
-async def orm_add_to_cart(session: AsyncSession, user_id: int, product_id: int):
-    """Добавляет товар в корзину пользователя или обновляет количество товара в корзине.
+async def _apply_add_to_cart(session: AsyncSession, user_id: int, product_id: int):
+    """Выполняет запросы добавления товара в корзину без фиксации транзакции.
 
-    Функция извлекает продукт из базы данных по id. Если продукта нет или он закончился, возвращает False.
-    Затем извлекается запись в корзине пользователя по его id и id продукта. Если запись есть,
-    продукт добавляется в корзину пользователя, если нет - создается новая запись.
+    Атомарно списывает единицу товара со "склада" одним условным UPDATE.
+    Если товара нет или он закончился, возвращает False. Затем одним UPSERT
+    создает запись в корзине пользователя или увеличивает количество в уже
+    существующей. Коммит остается на вызывающей функции, чтобы запросы можно
+    было объединять с другими в одну транзакцию.
 
     Args:
         session (AsyncSession): Асинхронная сессия для работы с базой данных.
@@ -286,33 +462,84 @@ async def orm_add_to_cart(session: AsyncSession, user_id: int, product_id: int):
             False, если товара нет или его количество равно нулю (или меньше нуля).
 
     """
-    item_query = select(Product).where(Product.id == product_id).with_for_update()
-    item_res = await session.execute(item_query)
-    product = item_res.scalar()
+    stock_query = (
+        update(Product)
+        .where(and_(Product.id == product_id, Product.quantity > 0))
+        .values(quantity=Product.quantity - 1)
+        .returning(Product.quantity)
+    )
+    stock_res = await session.execute(stock_query)
 
-    if not product or product.quantity <= 0:
+    if stock_res.first() is None:
         return False
 
-    cart_query = select(Cart).where(and_(Cart.user_id == user_id, Cart.product_id == product_id))
-    cart_res = await session.execute(cart_query)
-    cart = cart_res.scalar()
-
-    if cart:
-        cart.quantity += 1
-        product.quantity -= 1
-    else:
-        cart = Cart(
-            user_id=user_id,
-            product_id=product_id,
-            quantity=1
+    cart_query = (
+        upsert(Cart)
+        .values(user_id=user_id, product_id=product_id, quantity=1)
+        .on_conflict_do_update(
+            index_elements=['user_id', 'product_id'],
+            set_={'quantity': Cart.__table__.c.quantity + 1},
         )
-        product.quantity -= 1
-        session.add(cart)
-
-    await session.commit()
+    )
+    await session.execute(cart_query)
+    invalidate_key(f"cart_totals:{user_id}")
     return True
 
 
+async def orm_add_to_cart(session: AsyncSession, user_id: int, product_id: int):
+    """Добавляет товар в корзину пользователя или обновляет количество товара в корзине.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        user_id (int): Уникальный идентификатор пользователя.
+        product_id (int): Уникальный идентификатор товара.
+
+    Returns:
+        bool: True, если товар был добавлен в корзину или была создана новая запись.
+            False, если товара нет или его количество равно нулю (или меньше нуля).
+
+    """
+    added = await _apply_add_to_cart(session, user_id, product_id)
+    await session.flush()
+    return added
+
+
+async def orm_register_and_add_to_cart(
+        session: AsyncSession,
+        user_id: int,
+        product_id: int,
+        first_name: str | None = None,
+        last_name: str | None = None):
+    """Регистрирует пользователя при необходимости и добавляет товар в корзину одной транзакцией.
+
+    Upsert пользователя и запросы корзины выполняются на одном соединении и
+    фиксируются одним коммитом. SQLite не поддерживает изменяющие данные CTE,
+    поэтому объединить их в один запрос нельзя, но сетевых/транзакционных
+    накладных расходов остается столько же, сколько у одного вызова.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        user_id (int): Уникальный идентификатор пользователя.
+        product_id (int): Уникальный идентификатор товара.
+        first_name (str | None): Имя пользователя. По умолчанию None.
+        last_name (str | None): Фамилия пользователя. По умолчанию None.
+
+    Returns:
+        bool: True, если товар был добавлен в корзину или была создана новая запись.
+            False, если товара нет или его количество равно нулю (или меньше нуля).
+
+    """
+    user_query = (
+        upsert(User)
+        .values(user_id=user_id, first_name=first_name, last_name=last_name)
+        .on_conflict_do_nothing(index_elements=['user_id'])
+    )
+    await session.execute(user_query)
+    added = await _apply_add_to_cart(session, user_id, product_id)
+    await session.flush()
+    return added
+
+
 async def orm_get_user_carts(session: AsyncSession, user_id):
     """Извлекает все товары, находящиеся в корзине пользователя, включая данные о товарах.
 
@@ -324,11 +551,54 @@ async def orm_get_user_carts(session: AsyncSession, user_id):
         list[Cart]: Список объектов корзины с включенными данными о товаре.
 
     """
-    query = select(Cart).where(Cart.user_id == user_id).options(joinedload(Cart.product))
+    query = select(Cart).where(Cart.user_id == user_id).options(selectinload(Cart.product))
     result = await session.execute(query)
     return result.scalars().all()
 
 
+async def orm_get_cart_page(session: AsyncSession, user_id: int, page: int):
+    """Получает одну запись корзины пользователя для заданной страницы.
+
+    Страница выбирается в SQL (LIMIT 1 OFFSET page-1); товар записи загружается
+    одним JOIN, так как нужна ровно одна строка.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        user_id (int): Уникальный идентификатор пользователя.
+        page (int): Номер страницы, начиная с 1.
+
+    Returns:
+        Cart | None: Запись корзины текущей страницы с загруженным товаром
+            или None, если страница пуста.
+
+    """
+    result = await session.execute(_select_cart_page, {"user_id": user_id, "page_offset": page - 1})
+    return result.scalars().first()
+
+
+async def orm_get_cart_totals(session: AsyncSession, user_id: int):
+    """Возвращает количество записей и общую стоимость корзины пользователя.
+
+    Сумма quantity * price считается агрегатом в SQL одним запросом вместо
+    прохода по всем записям корзины в Python. Результат кэшируется на
+    COUNT_TTL секунд и сбрасывается при любой мутации корзины пользователя,
+    поэтому листание корзины обходится без повторных агрегатов.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия для работы с базой данных.
+        user_id (int): Уникальный идентификатор пользователя.
+
+    Returns:
+        tuple[int, float]: Количество записей в корзине и их общая стоимость.
+
+    """
+    async def load():
+        count, total_price = (await session.execute(_cart_totals, {"user_id": user_id})).one()
+        return count, total_price
+
+    return await cached(f"cart_totals:{user_id}", load, ttl=COUNT_TTL)
+
+
 async def orm_delete_from_cart(session: AsyncSession, user_id: int, product_id: int):
     """Удаляет товар из корзины пользователя, возвращая его количество обратно на "склад".
 
@@ -341,15 +611,19 @@ async def orm_delete_from_cart(session: AsyncSession, user_id: int, product_id:
         None: Функция ничего не возвращает.
 
     """
-    query = select(Cart).where(Cart.user_id == user_id, Cart.product_id == product_id).options(joinedload(Cart.product))
+    query = (
+        delete(Cart)
+        .where(and_(Cart.user_id == user_id, Cart.product_id == product_id))
+        .returning(Cart.quantity)
+    )
     res = await session.execute(query)
-    cart = res.scalar()
+    row = res.first()
 
-    if cart:
-        product = cart.product
-        product.quantity += cart.quantity
-        await session.delete(cart)
-        await session.commit()
+    if row:
+        await session.execute(
+            update(Product).where(Product.id == product_id).values(quantity=Product.quantity + row[0]))
+        await session.flush()
+        invalidate_key(f"cart_totals:{user_id}")
 
 
 async def orm_reduce_product_in_cart(session: AsyncSession, user_id: int, product_id: int):
@@ -368,19 +642,28 @@ async def orm_reduce_product_in_cart(session: AsyncSession, user_id: int, produc
             иначе - False.
 
     """
-    query = select(Cart).where(Cart.user_id == user_id, Cart.product_id == product_id).options(joinedload(Cart.product))
+    query = (
+        update(Cart)
+        .where(and_(Cart.user_id == user_id, Cart.product_id == product_id))
+        .values(quantity=Cart.quantity - 1)
+        .returning(Cart.quantity)
+    )
     cart_res = await session.execute(query)
-    cart = cart_res.scalar()
-
-    if cart:
-        if cart.quantity > 1:
-            cart.quantity -= 1
-            cart.product.quantity += 1
-            await session.commit()
-            return True
-        else:
-            cart.product.quantity += 1
-            await session.delete(cart)
-            await session.commit()
-            return False
-    return False
+    row = cart_res.first()
+
+    if row is None:
+        return False
+
+    await session.execute(
+        update(Product).where(Product.id == product_id).values(quantity=Product.quantity + 1))
+
+    if row[0] == 0:
+        await session.execute(
+            delete(Cart).where(and_(Cart.user_id == user_id, Cart.product_id == product_id)))
+        await session.flush()
+        invalidate_key(f"cart_totals:{user_id}")
+        return False
+
+    await session.flush()
+    invalidate_key(f"cart_totals:{user_id}")
+    return True
@@ -6,7 +6,7 @@ from aiogram import types
 # Заимствование
 class IsAdmin(Filter):
     def __init__(self, admins) -> None:
-        self.admins = admins
+        self.admins = frozenset(int(admin) for admin in admins)
 
     async def __call__(self, message: types.Message) -> bool:
         return message.from_user.id in self.admins
@@ -1,16 +1,22 @@
+import asyncio
+import functools
+from types import MappingProxyType
+
 from aiogram import F, Router, types
 from aiogram.filters import Command, StateFilter, or_f
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
 from filters.admin_fil import IsAdmin
+from handlers.mwre import PerChatConcurrency
 from handlers.keyboards import get_keyboard, get_callback_btns
 from database.requests import (
     orm_change_banner_image,
     orm_get_categories,
     orm_add_product,
+    orm_bulk_add_products,
     orm_delete_product,
-    orm_get_info_pages,
+    orm_get_info_page_names,
     orm_get_product,
     orm_get_products,
     orm_update_product,
@@ -20,9 +26,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 admin = Router()
 
+# Ограничивает число одновременных отправок, чтобы не упереться
+# в лимит Telegram ~30 сообщений в секунду на бота
+send_semaphore = asyncio.Semaphore(25)
+
 admins = [1188100227]
 admin.message.filter(IsAdmin(admins))
 
+per_chat = PerChatConcurrency()
+admin.message.middleware(per_chat)
+admin.callback_query.middleware(per_chat)
+
 admin_kb = get_keyboard(
         "Добавить товар",
         "Ассортимент",
@@ -58,11 +72,16 @@ class AddProduct(StatesGroup):
         price (State): Состояние для ввода цены товара.
         quantity (State): Состояние для ввода количества товара.
         image (State): Состояние для загрузки изображения товара.
+        confirm (State): Состояние выбора "добавить ещё товар или сохранить всё".
 
-        product_for_change (Optional[Product]): Переменная для хранения объекта продукта, который изменяется.
         texts (dict): Словарь, содержащий тексты подсказок для каждого состояния,
             которые будут отправляться пользователю.
 
+    Снимок изменяемого товара хранится в данных FSMContext под ключом
+    `product_for_change`, а не в атрибуте класса: данные состояния
+    изолированы по чатам и не пересекаются у одновременно работающих
+    администраторов.
+
     """
     name = State()
     description = State()
@@ -70,17 +89,58 @@ class AddProduct(StatesGroup):
     price = State()
     quantity = State()
     image = State()
+    confirm = State()
 
-    product_for_change = None
-
-    texts = {
+    # MappingProxyType защищает подсказки от случайного изменения из обработчиков
+    texts = MappingProxyType({
         'AddProduct:name': 'Введите название заново:',
         'AddProduct:description': 'Введите описание заново:',
         'AddProduct:category': 'Выберите категорию заново',
         'AddProduct:price': 'Введите стоимость заново:',
         'AddProduct:quantity': 'Введите количество заново',
         'AddProduct:image': 'Этот шаг последний',
-    }
+    })
+
+
+# Предыдущее состояние для каждого шага анкеты, вычисляется один раз при импорте:
+# back_step получает предшественника за O(1) вместо прохода по __all_states__
+# на каждое нажатие "назад". Для первого шага предшественника нет (None)
+PREV_STATE = {
+    step.state: previous
+    for previous, step in zip((None, *AddProduct.__all_states__), AddProduct.__all_states__)
+}
+
+
+# Кэш собранных inline-клавиатур: списки категорий и товаров меняются редко,
+# а разметка одинакова для всех администраторов. Ключ включает содержимое
+# кнопок, поэтому после изменения данных собирается новая клавиатура.
+# Размер ограничен: каждый новый набор товаров дает новый ключ, и без
+# лимита устаревшие клавиатуры копились бы все время жизни процесса
+_kb_cache = {}
+_KB_CACHE_MAXSIZE = 256
+
+
+def _cached_callback_kb(kind: str, btns: dict[str, str], sizes: tuple[int] = (2,)):
+    """Возвращает inline-клавиатуру из кэша или собирает и кэширует ее.
+
+    Args:
+        kind (str): Название места использования клавиатуры.
+        btns (dict[str, str]): Словарь, где ключи - текст кнопок, а значения - callback_data.
+        sizes (tuple[int], optional): Количество кнопок в каждой строке клавиатуры.
+
+    Returns:
+        InlineKeyboardMarkup: Inline клавиатура с кнопками.
+
+    """
+    key = (kind, tuple(btns.items()), sizes)
+    keyboard = _kb_cache.get(key)
+    if keyboard is None:
+        keyboard = get_callback_btns(btns=btns, sizes=sizes)
+        # Порядок вставки словаря используется как порядок вытеснения
+        while len(_kb_cache) >= _KB_CACHE_MAXSIZE:
+            _kb_cache.pop(next(iter(_kb_cache)))
+        _kb_cache[key] = keyboard
+    return keyboard
 
 
 def format_price(price: float):
@@ -108,7 +168,24 @@ def format_price(price: float):
         raise TypeError("Price must be a number")
     if price < 0:
         raise ValueError("Price cannot be negative")
-    return f"{price: _.2f} ₽".replace('_', ' ')
+    return f"{price: ,.2f} ₽".replace(',', ' ')
+
+
+@functools.lru_cache(maxsize=1024)
+def format_price_cached(price):
+    """Кэшированный вариант `format_price` для горячих путей отрисовки.
+
+    Цены товаров меняются редко, а форматируются при каждом показе меню;
+    lru_cache отдает готовую строку для уже встречавшихся значений.
+
+    Args:
+        price (float): Цена товара.
+
+    Returns:
+        str: Возвращает строку из отформатированной цены.
+
+    """
+    return format_price(price)
 
 
 @admin.message(Command("admin"))
@@ -144,8 +221,8 @@ async def admin_assortiment(message: types.Message, session: AsyncSession):
 
     """
     categories = await orm_get_categories(session)
-    await message.answer("Выберите категорию", reply_markup=get_callback_btns(
-        btns={category.name: f'category_{category.id}' for category in categories}))
+    await message.answer("Выберите категорию", reply_markup=_cached_callback_kb(
+        'assortiment', {category.name: f'category_{category.id}' for category in categories}))
 
 
 @admin.callback_query(F.data.startswith('category_'))
@@ -165,20 +242,39 @@ async def look_at_product(callback: types.CallbackQuery, session: AsyncSession):
         None: Функция ничего не возвращает.
 
      """
-    category_id = callback.data.split('_')[-1]
-    for product in await orm_get_products(session, int(category_id)):
-        await callback.message.answer_photo(
-            product.image,
-            caption=(
-                f"{product.name}\n"
-                f"{product.description}\n"
-                f"Стоимость: {format_price(float(product.price))}\n"
-                f"Количество товаров: {product.quantity}"
-            ),
-            reply_markup=get_callback_btns(btns={"Удалить": f"delete_{product.id}", "Изменить": f"change_{product.id}"},
-                                           sizes=(2,)))
+    def build_caption(product):
+        return (
+            f"{product.name}\n"
+            f"{product.description}\n"
+            f"Стоимость: {format_price_cached(product.price)}\n"
+            f"Количество товаров: {product.quantity}"
+        )
+
+    async def send_group(products_chunk):
+        async with send_semaphore:
+            # sendMediaGroup принимает от 2 до 10 фото, одиночный товар уходит обычным фото
+            if len(products_chunk) == 1:
+                await callback.message.answer_photo(products_chunk[0].image, caption=build_caption(products_chunk[0]))
+            else:
+                await callback.message.answer_media_group(
+                    [types.InputMediaPhoto(media=product.image, caption=build_caption(product))
+                     for product in products_chunk])
+
+    # rsplit с maxsplit=1 не сканирует всю строку в поисках остальных '_'
+    category_id = callback.data.rsplit('_', 1)[1]
+    products = await orm_get_products(session, int(category_id))
     await callback.answer()
-    await callback.message.answer("Вот список товаров")
+    await asyncio.gather(*(send_group(products[start:start + 10]) for start in range(0, len(products), 10)))
+
+    if products:
+        btns = {}
+        for product in products:
+            # Название товара не уникально: без id в тексте кнопки товары
+            # с одинаковыми именами затирали бы кнопки друг друга в словаре
+            btns[f"Удалить {product.name} (#{product.id})"] = f"delete_{product.id}"
+            btns[f"Изменить {product.name} (#{product.id})"] = f"change_{product.id}"
+        await callback.message.answer(
+            "Вот список товаров", reply_markup=_cached_callback_kb('products', btns))
 
 
 @admin.callback_query(F.data.startswith("delete_"))
@@ -196,8 +292,10 @@ async def delete_product_callback(callback: types.CallbackQuery, session: AsyncS
         None: Функция ничего не возвращает.
 
     """
-    await orm_delete_product(session, int(callback.data.split("_")[-1]))
-    await callback.answer("Товар удален")
+    # Удаление из базы и ответ на callback независимы и выполняются параллельно
+    await asyncio.gather(
+        orm_delete_product(session, int(callback.data.rsplit("_", 1)[1])),
+        callback.answer("Товар удален"))
     await callback.message.answer("Товар удален!")
 
 
@@ -217,8 +315,9 @@ async def add_content_for_banner(message: types.Message, state: FSMContext, sess
          None: Функция ничего не возвращает.
 
     """
+    _, names_csv = await orm_get_info_page_names(session)
     await message.answer(f"Отправьте фото баннера.\nВ описании укажите для какой страницы:\
-                         \n{', '.join([page.name for page in await orm_get_info_pages(session)])}",
+                         \n{names_csv}",
                          reply_markup=types.ReplyKeyboardRemove())
     await state.set_state(Banner.image)
 
@@ -241,10 +340,10 @@ async def add_banner(message: types.Message, state: FSMContext, session: AsyncSe
     """
     image_id = message.photo[-1].file_id
     page_disc = message.caption.strip()
-    pages_names = [page.name for page in await orm_get_info_pages(session)]
-    if page_disc not in pages_names:
+    names_set, names_csv = await orm_get_info_page_names(session)
+    if page_disc not in names_set:
         await message.answer(f"Введите правильное название страницы, например:\
-                         \n{', '.join(pages_names)}")
+                         \n{names_csv}")
         return
     await orm_change_banner_image(session, page_disc, image_id,)
     await message.answer("Баннер добавлен/изменен.", reply_markup=admin_kb)
@@ -269,8 +368,20 @@ async def change_product_callback(callback: types.CallbackQuery, state: FSMConte
         None: Функция ничего не возвращает.
 
     """
-    product_for_change = await orm_get_product(session, int(callback.data.split("_")[-1]))
-    AddProduct.product_for_change = product_for_change
+    product = await orm_get_product(session, int(callback.data.rsplit("_", 1)[1]))
+    # Кнопка могла устареть: товар уже удален другим администратором
+    if product is None:
+        await callback.answer("Товар не найден")
+        return
+
+    await state.update_data(product_for_change={
+        "id": product.id,
+        "name": product.name,
+        "description": product.description,
+        "price": product.price,
+        "quantity": product.quantity,
+        "image": product.image,
+    })
 
     await callback.answer()
     await callback.message.answer("Введите название товара", reply_markup=types.ReplyKeyboardRemove())
@@ -314,8 +425,6 @@ async def cancel(message: types.Message, state: FSMContext):
     current_state = await state.get_state()
     if current_state is None:
         return
-    if AddProduct.product_for_change:
-        AddProduct.product_for_change = None
     await state.clear()
     await message.answer("Действия отменены", reply_markup=admin_kb)
 
@@ -337,17 +446,16 @@ async def back_step(message: types.Message, state: FSMContext):
 
     """
     current_state = await state.get_state()
-    if current_state == AddProduct.name:
+    if current_state not in PREV_STATE:
+        return
+
+    previous = PREV_STATE[current_state]
+    if previous is None:
         await message.answer('Предыдущего шага нет. Введите название товара или напишите "отмена"')
         return
 
-    previous = None
-    for step in AddProduct.__all_states__:
-        if step == current_state:
-            await state.set_state(previous)
-            await message.answer(f"Вы вернулись к прошлому шагу \n {AddProduct.texts[previous.state]}")
-            return
-        previous = step
+    await state.set_state(previous)
+    await message.answer(f"Вы вернулись к прошлому шагу \n {AddProduct.texts[previous.state]}")
 
 
 @admin.message(AddProduct.name, F.text)
@@ -366,8 +474,9 @@ async def add_name(message: types.Message, state: FSMContext):
          None: Функция ничего не возвращает.
 
      """
-    if message.text == "." and AddProduct.product_for_change:
-        await state.update_data(name=AddProduct.product_for_change.name)
+    snapshot = (await state.get_data()).get("product_for_change")
+    if message.text == "." and snapshot:
+        await state.update_data(name=snapshot["name"])
     else:
         await state.update_data(name=message.text)
     await message.answer("Введите описание товара")
@@ -391,14 +500,15 @@ async def add_description(message: types.Message, state: FSMContext, session: As
         None: Функция ничего не возвращает.
 
     """
-    if message.text == "." and AddProduct.product_for_change:
-        await state.update_data(description=AddProduct.product_for_change.description)
+    snapshot = (await state.get_data()).get("product_for_change")
+    if message.text == "." and snapshot:
+        await state.update_data(description=snapshot["description"])
     else:
         await state.update_data(description=message.text)
 
     categories = await orm_get_categories(session)
-    await message.answer("Выберите категорию", reply_markup=get_callback_btns(
-        btns={category.name: str(category.id) for category in categories}))
+    await message.answer("Выберите категорию", reply_markup=_cached_callback_kb(
+        'add_product', {category.name: str(category.id) for category in categories}))
     await state.set_state(AddProduct.category)
 
 
@@ -439,8 +549,9 @@ async def add_price(message: types.Message, state: FSMContext):
         ValueError: Eсли введенное значение нельзя преобразовать в число с плавающей запятой.
 
     """
-    if message.text == "." and AddProduct.product_for_change:
-        await state.update_data(price=AddProduct.product_for_change.price)
+    snapshot = (await state.get_data()).get("product_for_change")
+    if message.text == "." and snapshot:
+        await state.update_data(price=snapshot["price"])
     else:
         try:
             float(message.text)
@@ -472,8 +583,9 @@ async def add_quantity(message: types.Message, state: FSMContext):
          ValueError: Если введенное значение нельзя преобразовать в целое число.
 
      """
-    if message.text == "." and AddProduct.product_for_change:
-        await state.update_data(quantity=AddProduct.product_for_change.quantity)
+    snapshot = (await state.get_data()).get("product_for_change")
+    if message.text == "." and snapshot:
+        await state.update_data(quantity=snapshot["quantity"])
     else:
         try:
             int(message.text)
@@ -492,7 +604,9 @@ async def add_image(message: types.Message, state: FSMContext, session: AsyncSes
 
     Если пользователь отправляет фото товара, оно сохраняется в контексте состояния,
     а если пользователь вводит точку (".") — используется текущее изображение товара (в случае изменения товара).
-    Затем данные сохраняются в базе данных, и пользователю отправляется уведомление о завершении операции.
+    При изменении товар сразу сохраняется в базе данных. При добавлении товар
+    попадает в список ожидающих записи, и администратор может добавить следующий
+    товар или сохранить весь список одним запросом.
 
     Args:
         message (types.Message): Сообщение от пользователя.
@@ -503,17 +617,74 @@ async def add_image(message: types.Message, state: FSMContext, session: AsyncSes
         None: Функция ничего не возвращает.
 
     """
-    if message.text and message.text == "." and AddProduct.product_for_change:
-        await state.update_data(image=AddProduct.product_for_change.image)
+    data = await state.get_data()
+    snapshot = data.get("product_for_change")
     if message.photo:
-        await state.update_data(image=message.photo[-1].file_id)
+        data["image"] = message.photo[-1].file_id
+    elif message.text and message.text == "." and snapshot:
+        data["image"] = snapshot["image"]
+
+    if snapshot:
+        # Запись в базу и ответ пользователю независимы и выполняются параллельно
+        await asyncio.gather(
+            orm_update_product(session, snapshot["id"], data),
+            message.answer("Товар добавлен/изменен", reply_markup=admin_kb))
+        await state.clear()
+        return
+
+    pending = data.get("pending_products", [])
+    pending.append({
+        "name": data["name"],
+        "description": data["description"],
+        "price": float(data["price"]),
+        "quantity": int(data["quantity"]),
+        "image": data["image"],
+        "category_id": int(data["category"]),
+    })
+    await state.update_data(pending_products=pending)
+    await state.set_state(AddProduct.confirm)
+    await message.answer(
+        f"Товаров к сохранению: {len(pending)}",
+        reply_markup=get_keyboard("Добавить ещё", "Готово"))
+
+
+@admin.message(AddProduct.confirm, F.text == "Добавить ещё")
+async def add_one_more(message: types.Message, state: FSMContext):
+    """Начинает ввод следующего товара, не сохраняя уже введенные.
+
+    Уже введенные товары остаются в списке ожидающих записи в данных состояния
+    и будут сохранены все вместе по кнопке "Готово".
+
+    Args:
+        message (types.Message): Сообщение от пользователя.
+        state (FSMContext): Контекст машины состояний, в котором сохраняются данные текущего процесса.
+
+    Returns:
+        None: Функция ничего не возвращает.
+
+    """
+    await message.answer("Введите название товара", reply_markup=types.ReplyKeyboardRemove())
+    await state.set_state(AddProduct.name)
+
+
+@admin.message(AddProduct.confirm, F.text == "Готово")
+async def flush_pending_products(message: types.Message, state: FSMContext, session: AsyncSession):
+    """Сохраняет все введенные товары одним запросом.
 
+    Список ожидающих записи товаров из данных состояния вставляется в базу
+    данных одним INSERT вместо отдельной транзакции на каждый товар.
+
+    Args:
+        message (types.Message): Сообщение от пользователя.
+        state (FSMContext): Контекст машины состояний, в котором сохраняются данные текущего процесса.
+        session (AsyncSession): Сессия для работы с базой данных.
+
+    Returns:
+        None: Функция ничего не возвращает.
+
+    """
     data = await state.get_data()
-    if AddProduct.product_for_change:
-        await orm_update_product(session, AddProduct.product_for_change.id, data)
-    else:
-        await orm_add_product(session, data)
-    await message.answer("Товар добавлен/изменен", reply_markup=admin_kb)
+    await asyncio.gather(
+        orm_bulk_add_products(session, data["pending_products"]),
+        message.answer("Товары добавлены", reply_markup=admin_kb))
     await state.clear()
-
-    AddProduct.product_for_change = None
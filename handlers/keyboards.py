@@ -20,6 +20,19 @@ class MenuCallBack(CallbackData, prefix="menu"):
     page: int = 1
     product_id: int | None = None
 
+    def pack(self):
+        """Упаковывает callback data без рефлексии по полям pydantic.
+
+        Исходящие значения формирует сам бот, поэтому полная сериализация
+        aiogram не нужна; разбор входящих данных (`unpack`) остается на
+        pydantic - это недоверенный путь.
+
+        Returns:
+            str: Строка callback data в формате фабрики колбэков.
+
+        """
+        return pack_menu(self.level, self.menu_name, self.category, self.page, self.product_id)
+
 
 class CartCallback(CallbackData, prefix="cart"):
     """Класс для создания структуры callback data для корзины (фабрика колбэков).
@@ -34,6 +47,80 @@ class CartCallback(CallbackData, prefix="cart"):
     page: int = 1
     product_id: int | None = None
 
+    def pack(self):
+        """Упаковывает callback data без рефлексии по полям pydantic.
+
+        См. `MenuCallBack.pack`.
+
+        Returns:
+            str: Строка callback data в формате фабрики колбэков.
+
+        """
+        return pack_cart(self.menu_name, self.page, self.product_id)
+
+
+def _chunks(items, sizes: tuple[int]):
+    """Разбивает последовательность кнопок на ряды согласно sizes.
+
+    Последний размер повторяется для оставшихся кнопок - так же,
+    как это делает `adjust` у билдеров клавиатур.
+
+    Args:
+        items (Sequence): Последовательность элементов для разбиения.
+        sizes (tuple[int]): Количество элементов в каждом ряду.
+
+    Yields:
+        Sequence: Очередной ряд элементов.
+
+    """
+    start = 0
+    index = 0
+    while start < len(items):
+        size = sizes[index] if index < len(sizes) else sizes[-1]
+        yield items[start:start + size]
+        start += size
+        index += 1
+
+
+def pack_menu(level: int, menu_name: str, category: int | None = None, page: int = 1, product_id: int | None = None):
+    """Собирает callback data для меню без создания объекта MenuCallBack.
+
+    Формат строки совпадает с `MenuCallBack(...).pack()`, но пропускает
+    валидацию pydantic: значения формируются самим ботом и заведомо корректны.
+    Используется на горячем пути построения клавиатур; разбор входящих
+    callback-запросов по-прежнему выполняет класс MenuCallBack.
+
+    Args:
+        level (int): Уровень меню.
+        menu_name (str): Имя меню.
+        category (Optional[int]): Категория меню. Может быть `None`.
+        page (int): Номер страницы. Значение по умолчанию 1.
+        product_id (Optional[int]): Идентификатор продукта. Может быть `None`.
+
+    Returns:
+        str: Строка callback data в формате фабрики колбэков.
+
+    """
+    return (f"menu:{level}:{menu_name}:{'' if category is None else category}"
+            f":{page}:{'' if product_id is None else product_id}")
+
+
+def pack_cart(menu_name: str, page: int = 1, product_id: int | None = None):
+    """Собирает callback data для корзины без создания объекта CartCallback.
+
+    Формат строки совпадает с `CartCallback(...).pack()`; см. `pack_menu`.
+
+    Args:
+        menu_name (str): Имя меню.
+        page (int): Номер страницы. Значение по умолчанию 1.
+        product_id (Optional[int]): Идентификатор продукта. Может быть `None`.
+
+    Returns:
+        str: Строка callback data в формате фабрики колбэков.
+
+    """
+    return f"cart:{menu_name}:{page}:{'' if product_id is None else product_id}"
+
 
 def get_keyboard(*btns, placeholder: str = None, sizes: tuple[int] = (2,)):
     """Создает клавиатуру.
@@ -56,18 +143,21 @@ def get_keyboard(*btns, placeholder: str = None, sizes: tuple[int] = (2,)):
 
     """
 
-    if not btns:
-        raise ValueError("Buttons must exist")
-    for button in btns:
-        if not isinstance(button, str):
-            raise TypeError("Each button must be a string")
+    # Проверки входных данных страхуют от ошибок программиста, а не пользователя:
+    # при запуске с python -O они отключаются вместе с __debug__
+    if __debug__:
+        if not btns:
+            raise ValueError("Buttons must exist")
+        for button in btns:
+            if not isinstance(button, str):
+                raise TypeError("Each button must be a string")
 
     keyboard = ReplyKeyboardBuilder()
 
-    for text in btns:
-        keyboard.add(KeyboardButton(text=text))
+    for chunk in _chunks(btns, sizes):
+        keyboard.row(*[KeyboardButton(text=text) for text in chunk])
 
-    return keyboard.adjust(*sizes).as_markup(resize_keyboard=True, input_field_placeholder=placeholder)
+    return keyboard.as_markup(resize_keyboard=True, input_field_placeholder=placeholder)
 
 
 def get_callback_btns(*, btns: dict[str, str], sizes: tuple[int] = (2,)):
@@ -87,24 +177,25 @@ def get_callback_btns(*, btns: dict[str, str], sizes: tuple[int] = (2,)):
         ValueError: Если принимаемый аргумент пустой.
 
     """
-    if not isinstance(btns, dict):
-        raise TypeError("Buttons must be a dictionary")
-    if not btns:
-        raise ValueError("Buttons dictionary cannot be empty")
-    for button, call in btns.items():
-        if not isinstance(button, str) and not isinstance(call, str):
-            raise TypeError("Both button and callback data must be a string")
-        if not isinstance(button, str):
-            raise TypeError("Each button must be a string")
-        if not isinstance(call, str):
-            raise TypeError("Each callback data must be a string")
+    if __debug__:
+        if not isinstance(btns, dict):
+            raise TypeError("Buttons must be a dictionary")
+        if not btns:
+            raise ValueError("Buttons dictionary cannot be empty")
+        for button, call in btns.items():
+            if not isinstance(button, str) and not isinstance(call, str):
+                raise TypeError("Both button and callback data must be a string")
+            if not isinstance(button, str):
+                raise TypeError("Each button must be a string")
+            if not isinstance(call, str):
+                raise TypeError("Each callback data must be a string")
 
     keyboard = InlineKeyboardBuilder()
 
-    for text, data in btns.items():
-        keyboard.add(InlineKeyboardButton(text=text, callback_data=data))
+    for chunk in _chunks(list(btns.items()), sizes):
+        keyboard.row(*[InlineKeyboardButton(text=text, callback_data=data) for text, data in chunk])
 
-    return keyboard.adjust(*sizes).as_markup()
+    return keyboard.as_markup()
 
 
 def get_user_catalog_btns(*, level: int, categories: list, sizes: tuple[int] = (2,)):
@@ -123,12 +214,12 @@ def get_user_catalog_btns(*, level: int, categories: list, sizes: tuple[int] = (
      """
     keyboard = InlineKeyboardBuilder()
 
-    for c in categories:
-        keyboard.add(InlineKeyboardButton(text=c.name,
-                                          callback_data=MenuCallBack(level=level+1, menu_name=c.name,
-                                                                     category=c.id).pack()))
+    for chunk in _chunks(categories, sizes):
+        keyboard.row(*[InlineKeyboardButton(text=c.name,
+                                            callback_data=pack_menu(level+1, c.name, category=c.id))
+                       for c in chunk])
 
-    return keyboard.adjust(*sizes).as_markup()
+    return keyboard.as_markup()
 
 
 def get_products_btns(*, level: int, category: int, page: int, pagination_btns: dict, product_id: int):
@@ -151,24 +242,17 @@ def get_products_btns(*, level: int, category: int, page: int, pagination_btns:
     keyboard = InlineKeyboardBuilder()
     
     keyboard.add(InlineKeyboardButton(text='Купить 💵',
-                                      callback_data=MenuCallBack(level=level, menu_name='add_to_cart',
-                                                                 product_id=product_id).pack()))
+                                      callback_data=pack_menu(level, 'add_to_cart', product_id=product_id)))
 
     row = []
     for text, menu_name in pagination_btns.items():
         if menu_name == "next":
-            row.append(InlineKeyboardButton(text=text, callback_data=MenuCallBack(
-                                                level=level,
-                                                menu_name=menu_name,
-                                                category=category,
-                                                page=page+1).pack()))
+            row.append(InlineKeyboardButton(
+                text=text, callback_data=pack_menu(level, menu_name, category=category, page=page+1)))
 
         elif menu_name == "previous":
-            row.append(InlineKeyboardButton(text=text, callback_data=MenuCallBack(
-                                                level=level,
-                                                menu_name=menu_name,
-                                                category=category,
-                                                page=page-1).pack()))
+            row.append(InlineKeyboardButton(
+                text=text, callback_data=pack_menu(level, menu_name, category=category, page=page-1)))
 
     return keyboard.row(*row).as_markup()
 
@@ -193,16 +277,16 @@ def get_user_cart(*, page: int | None, pagination_btns: dict | None, product_id:
 
     keyboard.add(InlineKeyboardButton(
         text='Удалить',
-        callback_data=CartCallback(menu_name='delete', product_id=product_id, page=page).pack()))
+        callback_data=pack_cart('delete', page=page, product_id=product_id)))
     keyboard.add(InlineKeyboardButton(
         text='-1',
-        callback_data=CartCallback(menu_name='decrement', product_id=product_id, page=page).pack()))
+        callback_data=pack_cart('decrement', page=page, product_id=product_id)))
     keyboard.add(InlineKeyboardButton(
         text='+1',
-        callback_data=CartCallback(menu_name='increment', product_id=product_id, page=page).pack()))
+        callback_data=pack_cart('increment', page=page, product_id=product_id)))
     keyboard.add(InlineKeyboardButton(
         text='Заказать',
-        callback_data=CartCallback(menu_name='order').pack()))
+        callback_data=pack_cart('order')))
 
     keyboard.adjust(*sizes)
 
@@ -211,10 +295,10 @@ def get_user_cart(*, page: int | None, pagination_btns: dict | None, product_id:
         if menu_name == "next":
             row.append(InlineKeyboardButton(
                 text=text,
-                callback_data=CartCallback(menu_name=menu_name, page=page+1).pack()))
+                callback_data=pack_cart(menu_name, page=page+1)))
         elif menu_name == "previous":
             row.append(InlineKeyboardButton(
                 text=text,
-                callback_data=CartCallback(menu_name=menu_name, page=page-1).pack()))
+                callback_data=pack_cart(menu_name, page=page-1)))
 
     return keyboard.row(*row).as_markup()
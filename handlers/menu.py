@@ -1,21 +1,45 @@
+import asyncio
+import functools
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from aiogram.types import InputMediaPhoto
 from aiogram import types
 
+from database.engine import async_session
+
 from database.requests import (
     orm_add_to_cart,
     orm_delete_from_cart,
     orm_get_banner,
     orm_get_categories,
-    orm_get_products,
+    orm_get_product_page,
+    orm_count_products,
     orm_get_product,
-    orm_get_user_carts,
+    orm_get_cart_page,
+    orm_get_cart_totals,
     orm_reduce_product_in_cart,
-    orm_add_user,
+    orm_register_and_add_to_cart,
 )
 from handlers.keyboards import get_user_catalog_btns, get_products_btns, get_user_cart, MenuCallBack
 from paginator.pag import Paginator
-from handlers.admin import format_price
+from handlers.admin import format_price, format_price_cached
+
+
+def _mul_fast(quantity, price):
+    """Умножает цену на количество без проверок входных данных.
+
+    Используется на горячем пути отрисовки, где значения уже прочитаны
+    из базы и заведомо корректны; валидирующая обертка - `multiplication`.
+
+    Args:
+        quantity (int): Количество товара.
+        price (float): Цена товара.
+
+    Returns:
+        float: Возвращает результат умножения.
+
+    """
+    return quantity * price
 
 
 def multiplication(quantity, price):
@@ -47,7 +71,7 @@ def multiplication(quantity, price):
         raise ValueError("Price cannot be negative")
     if quantity < 0:
         raise ValueError("Quantity cannot be negative")
-    return quantity * price
+    return _mul_fast(quantity, price)
 
 
 async def get_menu_content(
@@ -99,6 +123,30 @@ def pages(paginator: Paginator):
     return btns
 
 
+# Кэш собранных InputMediaPhoto для баннеров: объект одинаков для всех
+# пользователей, пока администратор не сменил баннер. Ключ включает file_id
+# и описание, поэтому после изменения баннера собирается новый объект
+_banner_media_cache = {}
+
+
+def _banner_media(menu_name: str, banner):
+    """Возвращает InputMediaPhoto баннера из кэша или собирает и кэширует его.
+
+    Args:
+        menu_name (str): Название страницы, которой принадлежит баннер.
+        banner (Banner): Объект баннера с изображением и описанием.
+
+    Returns:
+        InputMediaPhoto: Медиа-объект баннера для отправки или редактирования сообщения.
+
+    """
+    key = (menu_name, banner.image, banner.description)
+    media = _banner_media_cache.get(key)
+    if media is None:
+        media = _banner_media_cache[key] = InputMediaPhoto(media=banner.image, caption=banner.description)
+    return media
+
+
 async def catalog(session, level, menu_name):
     """Получает содержимое для отображения каталога, включая баннер, описание и кнопки для категорий.
 
@@ -116,15 +164,56 @@ async def catalog(session, level, menu_name):
             - `InlineKeyboardMarkup`: Inline клавиатура с кнопками для категорий товаров.
 
     """
-    banner = await orm_get_banner(session, menu_name)
-    image = InputMediaPhoto(media=banner.image, caption=banner.description)
+    async def load_banner():
+        async with async_session() as banner_session:
+            return await orm_get_banner(banner_session, menu_name)
 
-    categories = await orm_get_categories(session)
+    async def load_categories():
+        async with async_session() as categories_session:
+            return await orm_get_categories(categories_session)
+
+    # Независимые запросы выполняются параллельно, каждый на своей сессии:
+    # одну AsyncSession нельзя разделять между задачами gather
+    banner, categories = await asyncio.gather(load_banner(), load_categories())
+
+    image = _banner_media(menu_name, banner)
     kbds = get_user_catalog_btns(level=level, categories=categories)
 
     return image, kbds
 
 
+@functools.lru_cache(maxsize=512)
+def _build_product_media(image, name, description, quantity, price, page, pages):
+    """Собирает InputMediaPhoto товара, кэшируя результат по содержимому.
+
+    Повторные показы той же страницы (возврат "назад", двойные нажатия)
+    переиспользуют уже собранный объект вместо новой валидации pydantic.
+    Количество и цена входят в ключ, поэтому после покупки или изменения
+    товара собирается новый объект.
+
+    Args:
+        image (str): Telegram file_id изображения товара.
+        name (str): Название товара.
+        description (str): Описание товара.
+        quantity (int): Количество товара в наличии.
+        price (float): Цена товара.
+        page (int): Номер текущей страницы.
+        pages (int): Общее количество страниц.
+
+    Returns:
+        InputMediaPhoto: Медиа-объект товара с подписью.
+
+    """
+    return InputMediaPhoto(
+        media=image,
+        caption=(
+            f"{name}\n{description}\n"
+            f"В наличии: {quantity} шт\n"
+            f"Стоимость: {format_price_cached(price)}\n"
+            f"Товар {page} из {pages}"
+        ))
+
+
 async def products(session, level, category, page):
     """Получает информацию о продукте в заданной категории и странице.
 
@@ -143,19 +232,23 @@ async def products(session, level, category, page):
              - `InlineKeyboardMarkup`: Клавиатура с кнопками для пагинации и добавления товара в корзину.
 
     """
-    items = await orm_get_products(session, category_id=category)
+    async def load_page():
+        async with async_session() as page_session:
+            return await orm_get_product_page(page_session, category_id=category, page=page)
 
-    paginator = Paginator(items, page=page)
-    product = paginator.get_item()
+    async def load_total():
+        async with async_session() as count_session:
+            return await orm_count_products(count_session, category)
 
-    image = InputMediaPhoto(
-        media=product.image,
-        caption=(
-            f"{product.name}\n{product.description}\n"
-            f"В наличии: {product.quantity} шт\n"
-            f"Стоимость: {format_price(float(product.price))}\n"
-            f"Товар {paginator.page} из {paginator.pages}"
-        ))
+    # Строка страницы и счетчик не зависят друг от друга и запрашиваются
+    # параллельно, каждый на своей сессии
+    product, total = await asyncio.gather(load_page(), load_total())
+
+    paginator = Paginator(total, page=page)
+
+    image = _build_product_media(
+        product.image, product.name, product.description,
+        product.quantity, product.price, paginator.page, paginator.pages)
 
     pagination_btns = pages(paginator)
 
@@ -170,6 +263,13 @@ async def products(session, level, category, page):
     return image, kbds
 
 
+# Недавно встреченные пользователи: для них вставку в таблицу user можно
+# пропустить без запроса к базе. dict сохраняет порядок вставки, поэтому
+# при переполнении вытесняется самая старая запись
+KNOWN_USERS = {}
+KNOWN_USERS_LIMIT = 10_000
+
+
 async def add_to_cart(callback: types.CallbackQuery, callback_data: MenuCallBack, session: AsyncSession):
     """Добавляет товар в корзину для пользователя, если товар в наличии.
 
@@ -188,14 +288,28 @@ async def add_to_cart(callback: types.CallbackQuery, callback_data: MenuCallBack
 
       """
     user = callback.from_user
-    await orm_add_user(session, user_id=user.id, first_name=user.first_name, last_name=user.last_name)
-    cart = await orm_add_to_cart(session, user_id=user.id, product_id=callback_data.product_id)
+    is_new = user.id not in KNOWN_USERS
+    if is_new:
+        # Регистрация и добавление в корзину выполняются одной транзакцией
+        cart = await orm_register_and_add_to_cart(
+            session, user_id=user.id, product_id=callback_data.product_id,
+            first_name=user.first_name, last_name=user.last_name)
+    else:
+        cart = await orm_add_to_cart(session, user_id=user.id, product_id=callback_data.product_id)
 
     if cart:
         await callback.answer("Товар добавлен в корзину.")
     else:
         await callback.answer("Товар закончился.")
 
+    # Пользователь помечается известным только в самом конце: если обработчик
+    # упал раньше, транзакция обновления откатится вместе с регистрацией,
+    # и пометка не должна остаться
+    if is_new:
+        KNOWN_USERS[user.id] = None
+        if len(KNOWN_USERS) > KNOWN_USERS_LIMIT:
+            KNOWN_USERS.pop(next(iter(KNOWN_USERS)))
+
 
 async def carts(
         session: AsyncSession,
@@ -240,22 +354,38 @@ async def carts(
         if page > 1 and not is_cart:
             page -= 1
 
-    baskets = await orm_get_user_carts(session, user_id)
+    if menu_name in ("increment", "decrement", "delete"):
+        # Изменения еще не зафиксированы (коммит выполнит middleware в конце
+        # обновления) и видны только на сессии обновления, поэтому после
+        # мутации чтение идет на ней же, последовательно
+        cart = await orm_get_cart_page(session, user_id, page)
+        count, cart_total = await orm_get_cart_totals(session, user_id)
+    else:
+        async def load_page():
+            async with async_session() as page_session:
+                return await orm_get_cart_page(page_session, user_id, page)
+
+        async def load_totals():
+            async with async_session() as totals_session:
+                return await orm_get_cart_totals(totals_session, user_id)
+
+        # Просмотр без мутаций: запись текущей страницы и агрегаты корзины
+        # независимы и запрашиваются параллельно, каждый на своей сессии
+        cart, (count, cart_total) = await asyncio.gather(load_page(), load_totals())
 
-    if not baskets:
+    if cart is None:
         return False, False
 
     else:
-        paginator = Paginator(baskets, page=page)
-        cart = paginator.get_item()
+        paginator = Paginator(count, page=page)
 
-        cart_price = format_price(float(multiplication(cart.quantity, cart.product.price)))
-        total_price = format_price(float((sum(multiplication(cart.quantity, cart.product.price) for cart in baskets))))
+        cart_price = format_price(_mul_fast(cart.quantity, cart.product.price))
+        total_price = format_price(cart_total)
         image = InputMediaPhoto(
             media=cart.product.image,
             caption=(
                 f"{cart.product.name}\n"
-                f" {format_price(float(cart.product.price))} руб x {cart.quantity} = {cart_price} руб\n"
+                f" {format_price_cached(cart.product.price)} руб x {cart.quantity} = {cart_price} руб\n"
                 f"В наличии: {cart.product.quantity} шт\nТовар {paginator.page} из {paginator.pages} в корзине\n"
                 f"Общая стоимость товаров в корзине: {total_price} руб"
             ))
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, Awaitable, Callable, Dict
 
 from aiogram import BaseMiddleware
@@ -8,6 +9,9 @@ from sqlalchemy.ext.asyncio import async_sessionmaker
 
 # Промежуточное программное обеспечение для создания сессий
 # Заимствование из документации aiogram3
+# Все запросы одного обновления выполняются в одной транзакции: orm_*-функции
+# делают flush, а единственный коммит происходит здесь после обработчика.
+# Это убирает begin/commit на каждый запрос и делает обработку атомарной
 class DataBaseSession(BaseMiddleware):
 
     def __init__(self, session_pool: async_sessionmaker):
@@ -21,5 +25,30 @@ class DataBaseSession(BaseMiddleware):
     ) -> Any:
 
         async with self.session_pool() as session:
-            data['session'] = session
+            async with session.begin():
+                data['session'] = session
+                return await handler(event, data)
+
+
+# Промежуточное программное обеспечение для изоляции чатов:
+# события одного чата обрабатываются по очереди, разные чаты - параллельно,
+# чтобы медленный запрос одного администратора не блокировал остальных
+class PerChatConcurrency(BaseMiddleware):
+
+    def __init__(self):
+        self.semaphores: Dict[int, asyncio.Semaphore] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+
+        chat = data.get('event_chat')
+        if chat is None:
+            return await handler(event, data)
+
+        semaphore = self.semaphores.setdefault(chat.id, asyncio.Semaphore(1))
+        async with semaphore:
             return await handler(event, data)
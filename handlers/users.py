@@ -96,6 +96,30 @@ async def about(message: types.Message):
     await message.answer(text=text)
 
 
+async def _edit_menu_message(message: types.Message, media, reply_markup):
+    """Обновляет сообщение меню, не трогая фото, если оно не изменилось.
+
+    Если file_id нового медиа совпадает с фото текущего сообщения (например,
+    при изменении количества того же товара в корзине меняется только подпись),
+    выполняется дешевый edit_caption вместо edit_media: Telegram не
+    перепривязывает изображение. При несовпадении - обычный edit_media.
+
+    Args:
+        message (types.Message): Сообщение, которое нужно обновить.
+        media (InputMediaPhoto): Новое медиа с подписью.
+        reply_markup (InlineKeyboardMarkup): Новая клавиатура.
+
+    Returns:
+        None: Функция ничего не возвращает.
+
+    """
+    photo = message.photo
+    if photo and photo[-1].file_id == media.media:
+        await message.edit_caption(caption=media.caption, reply_markup=reply_markup)
+    else:
+        await message.edit_media(media=media, reply_markup=reply_markup)
+
+
 @router.callback_query(MenuCallBack.filter())
 async def user_menu(callback: types.CallbackQuery, callback_data: MenuCallBack, session: AsyncSession):
     """Обрабатывает callback-запросы для основного меню пользователя, выполняет соответствующие действия.
@@ -124,7 +148,7 @@ async def user_menu(callback: types.CallbackQuery, callback_data: MenuCallBack,
         page=callback_data.page,
     )
 
-    await callback.message.edit_media(media=media, reply_markup=reply_markup)
+    await _edit_menu_message(callback.message, media, reply_markup)
     await callback.answer()
 
 
@@ -160,5 +184,5 @@ async def user_cart(callback: types.CallbackQuery, callback_data: CartCallback,
         await callback.message.answer("В вашей корзине ничего нет!")
         return
 
-    await callback.message.edit_media(media=media, reply_markup=reply_markup)
+    await _edit_menu_message(callback.message, media, reply_markup)
     await callback.answer()
@@ -1,10 +1,19 @@
 import os
 import asyncio
+
+# uvloop заметно снижает накладные расходы цикла событий, но доступен
+# не везде (например, на Windows) - тогда остается стандартный цикл
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 from dotenv import load_dotenv
 from aiogram import Bot, Dispatcher
 
 from handlers.mwre import DataBaseSession
-from database.engine import async_session, async_main
+from database.engine import engine, async_session, async_main
+from database.requests import orm_warm_cache
 
 from handlers.admin import admin
 from handlers.users import router
@@ -34,15 +43,29 @@ async def main():
 
         """
     load_dotenv()
-    await async_main()
+    # Создание таблиц и заполнение справочников можно пропустить на "горячем"
+    # старте, задав DB_INIT=0 (схема уже создана и данные заполнены)
+    if os.getenv("DB_INIT", "1") == "1":
+        await async_main()
+    # Прогрев кэша категорий и баннеров, чтобы первые пользователи
+    # не ждали запросов к базе
+    async with async_session() as session:
+        await orm_warm_cache(session)
     bot = Bot(token=os.getenv('TOKEN'))
     dp = Dispatcher()
     dp.include_routers(router, admin)
     dp.update.middleware(DataBaseSession(session_pool=async_session))
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        # Соединения aiosqlite в пуле держат не-демонические потоки:
+        # без dispose() процесс не завершается после остановки polling
+        await engine.dispose()
 
 
 if __name__ == '__main__':
+    if uvloop is not None:
+        uvloop.install()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
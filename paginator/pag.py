@@ -1,21 +1,27 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True, frozen=True)
 class Paginator:
-    """Класс для управления пагинацией массива данных.
+    """Класс для управления пагинацией.
 
-    Этот класс предоставляет методы для работы с массивом,
-    включая получение картины по текущей странице и проверку наличия предыдущей и следующей страниц.
+    Пагинатор работает только с метаданными - общим числом элементов и номером
+    текущей страницы. Сами элементы он не хранит: строку текущей страницы
+    загружает вызывающий код (в SQL через LIMIT/OFFSET), поэтому ради одного
+    отображаемого элемента не приходится держать в памяти весь список.
+    Каждая страница содержит один элемент, так что число страниц равно
+    общему числу элементов.
+
+    Объект создается на каждый callback-запрос меню, поэтому класс объявлен
+    со slots=True - экземпляр обходится без __dict__; frozen=True страхует
+    метаданные страницы от случайного изменения после создания.
 
     Attrs:
-        array (list | tuple): Исходный массив данных, которых нужно пагинировать.
+        total (int): Общее количество элементов.
         page (int): Текущий номер страницы. По умолчанию 1.
-        len (int): Длина исходного массива.
         pages (int): Общее количество страниц.
 
     Methods:
-        __init__(): инициализирует объект класса Paginator
-
-        get_item() -> list | tuple:
-              озвращает элемент текущей страницы.
-
         has_next() -> int | bool:
             Проверяет наличие следующей страницы. Возвращает номер следующей страницы или False.
 
@@ -23,35 +29,33 @@ class Paginator:
             Проверяет наличие предыдущей страницы. Возвращает номер предыдущей страницы или False.
 
     """
-    def __init__(self, array: list | tuple, page: int = 1):
-        """Инициализирует объект класса Paginator.
+    total: int
+    page: int = 1
+
+    def __post_init__(self):
+        """Проверяет корректность метаданных страницы.
 
         Raises:
-            ValueError: Если массив данных пустой или номер страницы отрицательныый.
+            ValueError: Если общее число элементов не положительное или номер страницы отрицательныый.
             IndexError: Если общее число страниц меньше номера текущей страницы.
 
         """
-        if not array:
-            raise ValueError("Array cannot be empty")
-        if page < 1:
+        if self.total <= 0:
+            raise ValueError("Total must be greater than 0")
+        if self.page < 1:
             raise ValueError("Page must be greater than 0")
-        if len(array) < page:
+        if self.total < self.page:
             raise IndexError("This page doesn't exist")
 
-        self.array = array
-        self.page = page
-        self.len = len(self.array)
-        self.pages = self.len
-
-    def get_item(self):
-        """Возвращает элемент текущей страницы.
+    @property
+    def pages(self):
+        """Общее количество страниц.
 
         Returns:
-            Any: элемент по индексу.
+            int: Число страниц (совпадает с числом элементов - по одному на страницу).
 
         """
-        ind = self.page - 1
-        return self.array[ind]
+        return self.total
 
     def has_next(self):
         """Проверяет наличие следующей страницы.
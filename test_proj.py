@@ -9,39 +9,31 @@ from handlers.menu import multiplication
 
 def test_paginator_positive():
     """Позитивные тесты пагинатора"""
-    items = [1, 2, 3, 4, 5, 6]
-    item = [1]
-
-    paginator = Paginator(items, page=1)
+    paginator = Paginator(6, page=1)
     assert paginator.pages == 6
-    assert paginator.get_item() == 1
     assert paginator.has_next() == 2
     assert paginator.has_previous() is False
 
-    paginator = Paginator(items, page=6)
-    assert paginator.get_item() == 6
+    paginator = Paginator(6, page=6)
     assert paginator.has_next() is False
     assert paginator.has_previous() == 5
 
-    paginator = Paginator(item, page=1)
+    paginator = Paginator(1, page=1)
     assert paginator.pages == 1
-    assert paginator.get_item() == 1
     assert paginator.has_next() is False
     assert paginator.has_previous() is False
 
 
 def test_paginator_negative():
     """Негативные тесты пагинатора"""
-    items = [1, 2, 3]
-
-    with pytest.raises(ValueError, match="Array cannot be empty"):
-        Paginator([], page=1)
+    with pytest.raises(ValueError, match="Total must be greater than 0"):
+        Paginator(0, page=1)
 
     with pytest.raises(ValueError, match="Page must be greater than 0"):
-        Paginator(items, page=-1)
+        Paginator(3, page=-1)
 
     with pytest.raises(IndexError, match="This page doesn't exist"):
-        Paginator(items, page=5)
+        Paginator(3, page=5)
 
 
 def test_price_formatting_positive():
@@ -146,34 +138,28 @@ def test_inline_keyboard_markup_negative():
         get_callback_btns(btns=None)
 
 
-def test_multiplication_positive():
+@pytest.mark.parametrize("quantity, price, expected", [
+    (2, 1000.00, 2000.00),
+    (3, 1234.56, 3703.68),
+    (0, 10000, 0),
+    (200, 1000000, 200000000),
+    (5, 3333.4567, 16667.2835),
+])
+def test_multiplication_positive(quantity, price, expected):
     """Позитивные тесты умножения"""
 
-    assert multiplication(2, 1000.00) == 2000.00
-
-    assert multiplication(3, 1234.56) == 3703.68
-
-    assert multiplication(0, 10000) == 0
-
-    assert multiplication(200, 1000000) == 200000000
-
-    assert multiplication(5, 3333.4567) == 16667.2835
+    assert multiplication(quantity, price) == pytest.approx(expected)
 
 
-def test_multiplication_negative():
+@pytest.mark.parametrize("quantity, price, error, match", [
+    (100, -1, ValueError, "Price cannot be negative"),
+    (-2, 10000, ValueError, "Quantity cannot be negative"),
+    (-100, -1, ValueError, "Both price and quantity cannot be negative"),
+    ("100", 100, TypeError, "Quantity must be an integer"),
+    (None, 2000, TypeError, "Quantity must be an integer"),
+])
+def test_multiplication_negative(quantity, price, error, match):
     """Негативные тесты умножения"""
 
-    with pytest.raises(ValueError, match="Price cannot be negative"):
-        multiplication(100, -1)
-
-    with pytest.raises(ValueError, match="Quantity cannot be negative"):
-        multiplication(-2, 10000)
-
-    with pytest.raises(ValueError, match="Both price and quantity cannot be negative"):
-        multiplication(-100, -1)
-
-    with pytest.raises(TypeError, match="Quantity must be an integer"):
-        multiplication("100", 100)
-
-    with pytest.raises(TypeError, match="Quantity must be an integer"):
-        multiplication(None, 2000)
+    with pytest.raises(error, match=match):
+        multiplication(quantity, price)